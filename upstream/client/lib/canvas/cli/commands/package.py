@@ -178,8 +178,11 @@ class PackageCommand(Command):
                 if p.release is None:
                     p.release = '-'
 
-                if p.arch is None:
-                    p.arch = '-'
+                # arch is part of the package hash so leave it untouched
+                arch = p.arch
+
+                if arch is None:
+                    arch = '-'
 
                 if p.included:
                     p.action = '+'
@@ -193,7 +196,7 @@ class PackageCommand(Command):
                 else:
                     p.action = '?'
 
-                l.add_row([p.name, p.epoch, p.version, p.release, p.arch, p.action])
+                l.add_row([p.name, p.epoch, p.version, p.release, arch, p.action])
 
             print(l)
             print()
@@ -16,12 +16,58 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-import hawkey
-import json
 import re
-import dnf
 
 from canvas.set import CanvasSet
+from canvas.utilities import json_dumps
+
+# NOTE: dnf and hawkey are imported on first use as loading the DNF stack is
+# expensive and not required for working with package strings or dictionaries
+
+# package types that can be parsed directly from DNF
+_pkg_types = None
+
+def _get_pkg_types():
+    global _pkg_types
+
+    if _pkg_types is None:
+        try:
+            import dnf.package
+            import hawkey
+
+            _pkg_types = (dnf.package.Package, hawkey.Package)
+
+        # nothing can be a DNF package without DNF
+        except ImportError:
+            _pkg_types = ()
+
+    return _pkg_types
+
+# shared DNF base, constructing one is expensive so it is created on first use
+_base = None
+
+def _get_base():
+    global _base
+
+    if _base is None:
+        import dnf
+
+        _base = dnf.Base()
+
+    return _base
+
+def _get_sack():
+    """ Return the installed package sack, filling it only on first use """
+    db = _get_base()
+
+    if db.sack is None:
+        try:
+            db.fill_sack()
+
+        except OSError as e:
+            pass
+
+    return db.sack
 
 #
 # CLASS DEFINITIONS / IMPLEMENTATIONS
@@ -29,6 +75,9 @@ from canvas.set import CanvasSet
 class Package(object):
     """ A Canvas object that represents an installable Package. """
 
+    __slots__ = ('name', 'epoch', 'version', 'release', 'arch', 'action',
+                 'template', '_hash')
+
     # name[[#epoch]@version-release][:arch]
     RE_PACKAGE = re.compile(r"^([+~!])?([^#@:\s]+)(?:(?:#(\d+))?@([^\s-]+)-([^:\s-]+))?(?::(\w+))?$")
     RE_GROUP = re.compile(r"^([+~!])?(@[\w ]+)$")
@@ -49,15 +98,18 @@ class Package(object):
 
 
     def __init__(self, package, evr=True, template=None):
-        if isinstance(package, dnf.package.Package) or \
-                isinstance(package, hawkey.Package):
-            package = Package.parse_dnf(package, template=template)
-        elif isinstance(package, str):
+        if isinstance(package, str):
             package = Package.parse_str(package, template=template)
+        elif not isinstance(package, dict) and \
+                isinstance(package, _get_pkg_types()):
+            package = Package.parse_dnf(package, template=template)
 
         if not isinstance(package, dict):
             raise TypeError("Package must be a dict")
 
+        self._hash    = None
+
+        # NOTE: name and arch define the hash and are not to be changed
         self.name     = package.get('n', None)
         self.epoch    = package.get('e', None)
         self.version  = package.get('v', None)
@@ -89,23 +141,31 @@ class Package(object):
             self.release = None
 
     def __eq__(self, other):
-        if isinstance(other, Package):
-            if (self.arch is None) or (other.arch is None):
-                return (self.name == other.name)
-            else:
-                return (self.name == other.name) and (self.arch == other.arch)
+        if self is other:
+            return True
 
-        else:
+        if not isinstance(other, Package) or self.name != other.name:
             return False
 
+        # an undefined arch on either side matches any arch
+        return self.arch is None or other.arch is None or self.arch == other.arch
+
     def __hash__(self):
         # package uniqueness is based on name and arch
         # this allows packages with different archs to be
         # specified in a template
-        if self.arch is None:
-            return hash(self.name)
+        h = self._hash
 
-        return hash('{0}.{1}'.format(self.name, self.arch))
+        if h is None:
+            if self.arch is None:
+                h = hash(self.name)
+
+            else:
+                h = hash((self.name, self.arch))
+
+            self._hash = h
+
+        return h
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -119,17 +179,77 @@ class Package(object):
     @property
     def excluded(self):
         """ Is the package excluded from a template """
-        return self.action & (self.ACTION_EXCLUDE) == self.ACTION_EXCLUDE
+        return self.action & self.ACTION_EXCLUDE != 0
+
+    @classmethod
+    def from_specs(cls, specs, evr=True, template=None):
+        """ Generate Packages from multiple Package strings.
+
+        Equivalent to calling Package(spec) for each spec, however specs in
+        the package format are matched and assigned directly, skipping the
+        intermediate dictionary conversion.
+
+        Args:
+            cls: Holds the Package class
+            specs: An iterable of Package strings
+            evr: Keep the epoch, version and release information
+            template: The template the packages belong to
+        Returns:
+            A list of Package objects in the order of specs
+        Raises:
+            TypeError: If a spec is not a string
+            ValueError: If a spec does not match either the Package or groups formats
+
+        """
+        match = cls.RE_PACKAGE.match
+        actions = {'~': cls.ACTION_EXCLUDE, '!': cls.ACTION_IGNORE}
+
+        packages = []
+        append = packages.append
+
+        for spec in specs:
+            if not isinstance(spec, str):
+                raise TypeError("Package needs to be a string")
+
+            m = match(spec)
+
+            # groups and invalid specs take the regular path
+            if m is None:
+                append(cls(spec, evr=evr, template=template))
+                continue
+
+            (prefix, name, epoch, version, release, arch) = m.groups()
+
+            p = cls.__new__(cls)
+            p._hash    = None
+            p.name     = name
+            p.arch     = arch
+            p.action   = actions.get(prefix, cls.ACTION_INCLUDE)
+            p.template = template
+
+            if evr:
+                p.epoch   = epoch
+                p.version = version
+                p.release = release
+
+            else:
+                p.epoch   = None
+                p.version = None
+                p.release = None
+
+            append(p)
+
+        return packages
 
     @property
     def ignored(self):
         """ Is the package ignored """
-        return self.action & (self.ACTION_IGNORE) == self.ACTION_IGNORE
+        return self.action & self.ACTION_IGNORE != 0
 
     @property
     def included(self):
         """ Is the package included in a template """
-        return self.action & (self.ACTION_INCLUDE) == self.ACTION_INCLUDE
+        return self.action & self.ACTION_INCLUDE != 0
 
     def is_group(self):
         return self.name[0] == '@'
@@ -151,8 +271,7 @@ class Package(object):
             TypeError: If package is not a dnf or hawkey package
 
         """
-        if not (isinstance(pkg, dnf.package.Package) or \
-                isinstance(pkg, hawkey.Package)):
+        if not isinstance(pkg, _get_pkg_types()):
             raise TypeError("Pkg needs to be a DNF or hawkey package object")
 
         return {
@@ -186,46 +305,76 @@ class Package(object):
             raise TypeError("Package needs to be a string")
 
         pkg_match = cls.RE_PACKAGE.match(package)
-        grp_match = cls.RE_GROUP.match(package)
-        action = cls.ACTION_INCLUDE
 
+        # only fall back to the group format when the package format fails
         if pkg_match is not None:
-            regex = pkg_match
-        elif grp_match is not None:
-            regex = grp_match
-        else:
-            raise ValueError
-
-        if regex.group(1) == '~':
-            action = cls.ACTION_EXCLUDE
-
-        elif regex.group(1) == '!':
-            action = cls.ACTION_IGNORE
+            (prefix, name, epoch, version, release, arch) = pkg_match.groups()
 
-        name = regex.group(2)
-
-        if regex is pkg_match:
-            epoch   = regex.group(3)
-            version = regex.group(4)
-            release = regex.group(5)
-            arch    = regex.group(6)
-
-            return {
+            obj = {
                 'n': name,
                 'e': epoch,
                 'v': version,
                 'r': release,
                 'a': arch,
-                'z': action,
                 't': template
             }
 
-        return {'n': name, 'z': action, 't': template}
+        else:
+            grp_match = cls.RE_GROUP.match(package)
+
+            if grp_match is None:
+                raise ValueError
+
+            (prefix, name) = grp_match.groups()
+
+            obj = {'n': name, 't': template}
+
+        if prefix == '~':
+            obj['z'] = cls.ACTION_EXCLUDE
+
+        elif prefix == '!':
+            obj['z'] = cls.ACTION_IGNORE
+
+        else:
+            obj['z'] = cls.ACTION_INCLUDE
+
+        return obj
 
     @property
     def pinned(self):
         """ Is the package pinned to its version """
-        return self.action & (self.ACTION_PIN) == self.ACTION_PIN
+        return self.action & self.ACTION_PIN != 0
+
+    @classmethod
+    def resolve_many(cls, packages, db=None):
+        """ Resolve multiple packages to DNF Package objects in one query.
+
+        Args:
+            cls: Holds the Package class
+            packages: An iterable of Package objects
+            db: A DNF Base object
+        Returns:
+            A dictionary of package name to the installed DNF package object,
+            names that are not installed are omitted
+        Raises:
+            OSError: If errors are encountered in DNF
+
+        """
+        import dnf
+
+        if isinstance(db, dnf.Base):
+            sack = db.sack
+
+        else:
+            sack = _get_sack()
+
+        names = [p.name for p in packages]
+
+        resolved = {}
+        for pkg in sack.query().installed().filter(name=names):
+            resolved.setdefault(pkg.name, pkg)
+
+        return resolved
 
     def to_kickstart(self):
         """ Return a kickstart compatible string representation """
@@ -239,53 +388,59 @@ class Package(object):
 
     def to_json(self):
         """ Return a json representation of the package object """
-        return json.dumps(self.to_object(), separators=(',', ':'), sort_keys=True)
+        return json_dumps(self.to_object())
 
     def to_object(self):
         """ Return a dictionary representation of the package object """
-        obj = {
-            'n': self.name,
-            'e': self.epoch,
-            'v': self.version,
-            'r': self.release,
-            'a': self.arch,
-            'z': self.action,
-        }
-
         # only build with non-None values
-        return {k: v for k, v in obj.items() if v != None}
+        obj = {'n': self.name}
 
-    def to_pkg_spec(self):
-        """ Return a dictionary representation of the package object """
-        pkg = self.name
+        if self.epoch is not None:
+            obj['e'] = self.epoch
 
-        # calculate evr
-        evr = ''
+        if self.version is not None:
+            obj['v'] = self.version
+
+        if self.release is not None:
+            obj['r'] = self.release
+
+        if self.arch is not None:
+            obj['a'] = self.arch
+
+        if self.action is not None:
+            obj['z'] = self.action
+
+        return obj
+
+    def to_pkg_spec(self):
+        """ Return the DNF pkg_spec representation of the package object """
+        pkg = [self.name]
 
         if self.epoch is not None or self.version is not None:
-            pkg += '-'
+            pkg.append('-')
 
+        # NOTE: epoch is an int when parsed from a DNF package
         if self.epoch is not None:
-            evr = self.epoch + ':'
+            pkg.append(str(self.epoch))
+            pkg.append(':')
 
         if self.version is not None and self.release is not None:
-            db = dnf.Base()
-            conf = db.conf.substitutions
-            evr += '{0}-{1}.fc{2}'.format(self.version, self.release, conf['releasever'])
+            pkg.append(self.version)
+            pkg.append('-')
+            pkg.append(self.release)
+            pkg.append('.fc')
+            pkg.append(_get_base().conf.substitutions['releasever'])
         # NOTE: This is valid according to DNF docs,
         # however current str form makes this impossible
         #elif self.version is not None:
-        #    evr += self.version
-
-        # append evr if appropriate
-        if evr:
-            pkg += evr
+        #    pkg.append(self.version)
 
         # append arch if appropriate
         if self.arch is not None:
-            pkg += '.' + self.arch
+            pkg.append('.')
+            pkg.append(self.arch)
 
-        return pkg
+        return ''.join(pkg)
 
     def to_pkg(self, db=None):
         """ Convert this package into a DNF Package object.
@@ -297,34 +452,127 @@ class Package(object):
             OSError: If errors are encountered in DNF
 
         """
+        import dnf
 
-        if not isinstance(db, dnf.Base):
-            db = dnf.Base()
-            try:
-                db.fill_sack()
-
-            except OSError as e:
-                pass
+        if isinstance(db, dnf.Base):
+            sack = db.sack
 
-        p_list = db.sack.query().installed().filter(name=self.name)
+        else:
+            sack = _get_sack()
 
-        if not p_list:
-            return None
+        p_list = sack.query().installed().filter(name=self.name)
 
-        return list(p_list)[0]
+        return next(iter(p_list), None)
 
 
 class PackageSet(CanvasSet):
     def __init__(self, initvalue=()):
-        CanvasSet.__init__(self, initvalue)
+        # packages are keyed on (name, arch) and the archs defined for each
+        # name are tracked so that membership and insertion are O(1)
+        self._set = {}
+        self._archs = {}
+
+        for value in initvalue:
+            self.add(value)
+
+    def __contains__(self, item):
+        if not isinstance(item, Package):
+            return False
+
+        archs = self._archs.get(item.name)
+
+        if archs is None:
+            return False
+
+        # an undefined arch is loosely equal to any arch of the same name
+        return item.arch is None or None in archs or item.arch in archs
+
+    def __getitem__(self, index):
+        # NOTE: indexing is O(n) as the dict values are not indexable
+        return list(self._set.values())[index]
+
+    def __iter__(self):
+        return iter(self._set.values())
 
     def add(self, item):
-        if item not in self._set:
-            self._set.append(item)
+        archs = self._archs.get(item.name)
+
+        if archs is None:
+            self._archs[item.name] = [item.arch]
+            self._set[(item.name, item.arch)] = item
+
+        elif item.arch is None:
+            return
+
+        # replace if new package has more explicit arch definition than existing
+        # NOTE: the dict is rebuilt to keep the replaced package's position
+        elif None in archs:
+            old = (item.name, None)
+            new = (item.name, item.arch)
+
+            self._archs[item.name] = [item.arch]
+            self._set = {(new if k == old else k): (item if k == old else x)
+                         for k, x in self._set.items()}
+
+        elif item.arch not in archs:
+            archs.append(item.arch)
+            self._set[(item.name, item.arch)] = item
+
+    def discard(self, item):
+        if item not in self:
+            raise ValueError("item not in set")
 
-        # add if new package has more explicit arch definition than existing
-        elif item.arch is not None:
-            for i, x in enumerate(self._set):
-                if x.name == item.name and x.arch is None:
-                    self._set[i] = item
+        archs = self._archs[item.name]
+
+        # remove the exact arch match, otherwise the first loosely equal one
+        arch = item.arch if item.arch in archs else archs[0]
+
+        archs.remove(arch)
+        if not archs:
+            del self._archs[item.name]
+
+        del self._set[(item.name, arch)]
+
+    def difference(self, other):
+        if not isinstance(other, CanvasSet):
+            raise NotImplementedError
+
+        uniq_self = self.__class__()
+        uniq_other = self.__class__()
+
+        # items within a set are already unique so bypass add
+        uniq_self._set = {k: x for k, x in self._set.items() if x not in other}
+        uniq_other._set = {(x.name, x.arch): x for x in other if x not in self}
+
+        for s in (uniq_self, uniq_other):
+            for (name, arch) in s._set:
+                s._archs.setdefault(name, []).append(arch)
+
+        return (uniq_self, uniq_other)
+
+    def union(self, *args):
+        if len(args) == 0:
+            raise Exception('No CanvasSets defined for union.')
+
+        # copy our state directly rather than re-adding each package
+        u = self.__class__()
+        u._set = dict(self._set)
+        u._archs = {name: list(archs) for name, archs in self._archs.items()}
+
+        for o in args:
+            if not isinstance(o, CanvasSet):
+                raise NotImplementedError
+
+            # add takes care of uniqueness so let's use it
+            for x in o:
+                u.add(x)
+
+        return u
+
+    def to_object(self):
+        """ Return a list of package dictionaries sorted by name and arch """
+        # a name with an undefined arch has no other archs defined so the
+        # (name, arch) keys never compare None with a string
+        packages = self._set
 
+        return [packages[k].to_object() for k in sorted(packages)]
@@ -16,24 +16,84 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-import dnf
-import json
-
 from canvas.set import CanvasSet
+from canvas.utilities import json_dumps
+
+# NOTE: dnf is imported on first use as loading it is expensive and not
+# required for working with repository strings or dictionaries
+
+# repository types that can be parsed directly from DNF
+_repo_types = None
+
+def _get_repo_types():
+    global _repo_types
+
+    if _repo_types is None:
+        try:
+            import dnf.repo
+
+            _repo_types = (dnf.repo.Repo,)
+
+        # nothing can be a DNF repo without DNF
+        except ImportError:
+            _repo_types = ()
+
+    return _repo_types
 
 class Repository(object):
     """ A Canvas object that represents a Repository of packages. """
 
+    __slots__ = ('_name', '_stub', '_baseurl', '_mirrorlist', '_metalink',
+                 '_gpgkey', '_enabled', '_gpgcheck', '_cost', '_install',
+                 '_ignoregroups', '_proxy', '_noverifyssl',
+                 '_exclude_packages', '_include_packages', '_priority',
+                 '_meta_expired', '_template', '_action')
+
     # CONSTANTS
     ACTION_EXCLUDE          = 0x02
     ACTION_INCLUDE          = 0x01
 
+    # object keys mapped to the attribute they serialize
+    OBJECT_KEYS = (
+        ('s',  '_stub'),
+        ('n',  '_name'),
+        ('bu', '_baseurl'),
+        ('ml', '_mirrorlist'),
+        ('ma', '_metalink'),
+        ('e',  '_enabled'),
+        ('gc', '_gpgcheck'),
+        ('gk', '_gpgkey'),
+        ('me', '_meta_expired'),
+        ('c',  '_cost'),
+        ('p',  '_priority'),
+        ('i',  '_install'),
+        ('xp', '_exclude_packages'),
+        ('ip', '_include_packages'),
+        ('z',  '_action'),
+    )
+
+    # supported kickstart repo options mapped to the repo dictionary key and
+    # how the value is parsed, None being a flag with no value
+    KS_OPTIONS = {
+        'baseurl':      ('baseurl',          list),
+        'cost':         ('cost',             str),
+        'excludepkgs':  ('exclude_packages', list),
+        'ignoregroups': ('ignoregroups',     bool),
+        'includepkgs':  ('include_packages', list),
+        'install':      ('install',          None),
+        'mirrorlist':   ('mirrorlist',       str),
+        'name':         ('name',             str),
+        'noverifyssl':  ('noverifyssl',      None),
+        'proxy':        ('proxy',            str),
+    }
+
     def __init__(self, repository, template=None):
 
         if isinstance(repository, str):
             repository = Repository.parse_str(repository, template=template)
 
-        elif isinstance(repository, dnf.repo.Repo):
+        elif not isinstance(repository, dict) and \
+                isinstance(repository, _get_repo_types()):
             repository = Repository.parse_dnf(repository, template=template)
 
         if not isinstance(repository, dict):
@@ -144,49 +204,44 @@ class Repository(object):
             return repo
 
         for arg in repository.split("--"):
-            if arg == 'repo' or arg == '' or arg == 'repo ':
-                continue
-
-            elif arg.startswith('name='):
-                name = cls._parse_str_arg(arg, 'name=')
+            (option, sep, _) = arg.partition('=')
+            option = option.strip()
 
-                repo['name'] = name
-                repo['stub'] = name.replace(' ', '-').replace('---', '-').lower()
-
-            elif arg.startswith('baseurl='):
-                baseurl = cls._parse_str_arg(arg, 'baseurl=')
-                repo['baseurl'] = list(filter(None, baseurl.split(',')))
-
-            elif arg.startswith('mirrorlist='):
+            if option == 'repo' or option == '':
+                continue
 
-                # Not actually a comma-separated list just a url to a list
-                repo['mirrorlist'] = cls._parse_str_arg(arg, 'mirrorlist=')
+            if option not in cls.KS_OPTIONS:
+                raise ValueError("Unsupported option '{}' in kickstart repo".format(arg))
 
-            elif arg.startswith('cost='):
-                repo['cost'] = cls._parse_str_arg(arg, 'cost=')
+            (key, kind) = cls.KS_OPTIONS[option]
 
-            elif arg.startswith('excludepkgs='):
-                exclude_packages = cls._parse_str_arg(arg, 'excludepkgs=').split(',')
-                repo['exclude_packages'] = list (filter(None, exclude_packages))
+            if kind is None:
+                repo[key] = True
+                continue
 
-            elif arg.startswith('includepkgs='):
-                include_packages = cls._parse_str_arg(arg, 'includepkgs=').split(',')
-                repo['include_packages'] = list (filter(None, include_packages))
+            # valued options must be given as --option=value
+            if sep != '=':
+                raise ValueError("Unsupported option '{}' in kickstart repo".format(arg))
 
-            elif arg.startswith('proxy='):
-                repo['proxy'] = cls._parse_str_arg(arg, 'proxy=')
+            value = cls._parse_str_arg(arg, option + '=')
 
-            elif arg.startswith('ignoregroups=true'):
-                repo['ignoregroups'] = True
+            if kind is list:
+                # urls and package names are comma-separated lists
+                repo[key] = list(filter(None, value.split(',')))
 
-            elif arg.startswith('noverifyssl'):
-                repo['noverifyssl'] = True
+            elif kind is bool:
+                # fedora documentation implies that it must be --option=true
+                if value != 'true':
+                    raise ValueError("Unsupported option '{}' in kickstart repo".format(arg))
 
-            elif arg.startswith('install'):
-                repo['install'] = True
+                repo[key] = True
 
             else:
-                raise ValueError("Unsupported option '{}' in kickstart repo".format(arg))
+                # NOTE: mirrorlist is not a comma-separated list just a url to a list
+                repo[key] = value
+
+        if 'name' in repo:
+            repo['stub'] = repo['name'].replace(' ', '-').replace('---', '-').lower()
 
         if 'baseurl' in repo and 'mirrorlist' in repo:
             raise ValueError("Kickstart format cannot have both baseurl and mirrorlist")
@@ -195,8 +250,7 @@ class Repository(object):
 
     @classmethod
     def parse_dnf(cls, repository, template=None):
-
-        if not isinstance(repository, dnf.repo.Repo):
+        if not isinstance(repository, _get_repo_types()):
             raise TypeError("Repository must be a dnf.repo.Repo")
 
 
@@ -380,31 +434,23 @@ class Repository(object):
         return repo # + "\n" + url
 
     def to_json(self):
-        return json.dumps(self.to_object(), separators=(',', ':'), sort_keys=True)
+        return json_dumps(self.to_object())
 
     def to_object(self):
-        o = {
-            's':  self._stub,
-            'n':  self._name,
-            'bu': self._baseurl,
-            'ml': self._mirrorlist,
-            'ma': self._metalink,
-            'e':  self._enabled,
-            'gc': self._gpgcheck,
-            'gk': self._gpgkey,
-            'me': self._meta_expired,
-            'c':  self._cost,
-            'p':  self._priority,
-            'i':  self._install,
-            'xp': self._exclude_packages,
-            'ip': self._include_packages,
-            'z':  self._action,
-        }
+        o = {}
 
         # only build with non-None values
-        return {k: v for k, v in o.items() if v != None}
+        for (k, attr) in self.OBJECT_KEYS:
+            v = getattr(self, attr)
+
+            if v is not None:
+                o[k] = v
+
+        return o
 
     def to_repo(self, conf=None):
+        import dnf.repo
+
         if conf is None:
             db = dnf.Base()
             conf = db.conf
@@ -456,4 +502,22 @@ class Repository(object):
 
 class RepoSet(CanvasSet):
     def __init__(self, initvalue=()):
+        # repositories are unique on stub, track the stubs alongside the list
+        # so that membership does not require a linear scan
+        self._stubs = set()
         CanvasSet.__init__(self, initvalue)
+
+    def __contains__(self, item):
+        return isinstance(item, Repository) and item.stub in self._stubs
+
+    def add(self, item):
+        if item not in self:
+            self._stubs.add(item.stub)
+            self._set.append(item)
+
+    def discard(self, item):
+        if item not in self:
+            raise ValueError("item not in set")
+
+        self._stubs.remove(item.stub)
+        self._set.remove(item)
@@ -38,14 +38,14 @@ class CanvasSet(collections.MutableSet):
         return len(self._set)
 
     def __repr__(self):
-        return "%s(%r)" % (type(self).__name__, self._set)
+        return "%s(%r)" % (type(self).__name__, list(self))
 
     def add(self, item):
         if item not in self._set:
             self._set.append(item)
 
     def as_list(self):
-        return list(self._set)
+        return list(self)
 
     def discard(self, item):
         if item not in self._set:
@@ -61,13 +61,13 @@ class CanvasSet(collections.MutableSet):
         uniq_other = self.__class__()
 
         # find unique items to self
-        for x in self._set:
+        for x in self:
             if x not in other:
                 uniq_self.add(x)
 
         # find unique items to other
         for x in other:
-            if x not in self._set:
+            if x not in self:
                 uniq_other.add(x)
 
         return (uniq_self, uniq_other)
@@ -76,7 +76,7 @@ class CanvasSet(collections.MutableSet):
         if len(args) == 0:
             raise Exception('No CanvasSets defined for union.')
 
-        u = self.__class__(self._set)
+        u = self.__class__(self)
 
         for o in args:
             if not isinstance(o, CanvasSet):
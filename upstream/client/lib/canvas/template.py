@@ -600,11 +600,18 @@ class Template(object):
         if len(self.packages_all):
             logging.info('Syncing history ...')
 
-            for p in self.packages_all:
-                if p.included:
-                    pkg = p.to_pkg();
-                    if pkg is not None:
-                        db.yumdb.get_package(pkg).reason = 'user'
+            # load the post transaction state once for all packages
+            installed = dnf.Base()
+            try:
+                installed.fill_sack()
+
+            except OSError as e:
+                pass
+
+            included = [p for p in self.packages_all if p.included]
+
+            for pkg in Package.resolve_many(included, db=installed).values():
+                db.yumdb.get_package(pkg).reason = 'user'
 
         # check all non-ks objects
         if len(self.objects_all):
@@ -850,17 +857,16 @@ class Template(object):
 
     def to_object(self, resolved=False):
         if resolved:
-            _packages = list(self.packages_all)
+            _packages = self.packages_all
             _repos    = list(self.repos_all)
             _objects  = self.objects_all
 
         else:
-            _packages = list(self.packages)
+            _packages = self.packages
             _repos    = list(self.repos)
             _objects  = self.objects
 
-        # sort packages and repos
-        _packages.sort(key=lambda x: x.name)
+        # sort repos, packages are sorted on conversion
         _repos.sort(key=lambda x: x.stub)
 
         # we don't sort objects as insertion order is important
@@ -873,7 +879,7 @@ class Template(object):
             'title':       self._title,
             'description': self._description,
             'includes':    self._includes,
-            'packages':    [p.to_object() for p in _packages],
+            'packages':    _packages.to_object(),
             'repos':       [r.to_object() for r in _repos],
             'stores':      self._stores,
             'objects':     [o.to_object() for o in _objects],
@@ -1,9 +1,16 @@
+import json
 import os
 import shutil
 import subprocess
 import tarfile
 import zipfile
 
+# prefer the faster orjson encoder when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def copy_file(path, to_directory='.'):
     dst_path = os.path.join(to_directory, os.path.basename(path))
 
@@ -38,3 +45,10 @@ def extract_file(path, to_directory='.'):
 
     finally:
         os.chdir(cwd)
+
+def json_dumps(obj):
+    """ Return the compact, key sorted json representation of obj """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode('utf-8')
+
+    return json.dumps(obj, separators=(',', ':'), sort_keys=True)
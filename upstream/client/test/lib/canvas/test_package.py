@@ -203,6 +203,9 @@ class PackageTestCase(TestCase):
         with self.assertRaises(TypeError):
             Package(1)
 
+        with self.assertRaises(TypeError):
+            Package(None)
+
 
     def test_package_parse_str(self):
 
@@ -247,6 +250,47 @@ class PackageTestCase(TestCase):
         self.assertEqual(None, p2.release)
         self.assertEqual("x86_64", p2.arch)
 
+    def test_package_from_specs(self):
+        specs = ["foo", "~foo:x86_64", "bar@2.1.4-0", "baz#1@2.1-3:x86_64",
+                 "!qux:i386", "@Development Tools"]
+
+        p_list = Package.from_specs(specs, template='test')
+
+        # Matches the regular constructor
+        self.assertEqual([Package(s, template='test').to_object() for s in specs],
+                         [p.to_object() for p in p_list])
+        self.assertEqual(['test'] * len(specs), [p.template for p in p_list])
+        self.assertEqual([hash(Package(s)) for s in specs], [hash(p) for p in p_list])
+
+        # Strip evr
+        p1 = Package.from_specs(["baz#1@2.1-3:x86_64"], evr=False)[0]
+        self.assertEqual({'n': 'baz', 'a': 'x86_64', 'z': Package.ACTION_INCLUDE},
+                         p1.to_object())
+
+        with self.assertRaises(ValueError):
+            Package.from_specs(["foo", "bar@1"])
+
+        with self.assertRaises(TypeError):
+            Package.from_specs([1])
+
+    def test_package_parse_str_whitespace(self):
+        # Trailing newline of a manifest line is accepted
+        self.assertEqual('foo', Package('foo\n').name)
+        self.assertEqual('x86_64', Package('foo:x86_64\n').arch)
+        self.assertEqual('3', Package('bar@1.2-3\n').release)
+        self.assertEqual(['foo'], [p.name for p in Package.from_specs(['foo\n'])])
+
+        # Unicode whitespace is not part of a name
+        with self.assertRaises(ValueError):
+            Package('foo\xa0bar')
+
+        with self.assertRaises(ValueError):
+            Package('foo\vbar')
+
+    def test_package_parse_str_unicode(self):
+        self.assertEqual('@Développement', Package('@Développement').name)
+        self.assertEqual('x86_é', Package('foo:x86_é').arch)
+
     def test_package_excluded(self):
         # Release is required
         p1 = Package("~foo")
@@ -284,6 +328,23 @@ class PackageTestCase(TestCase):
         # Not a package
         self.assertNotEqual(p3, 'str')
 
+    def test_package_hash(self):
+        p1 = Package({'n': 'foo', 'a': 'x86_64'})
+        p2 = Package({'n': 'foo', 'a': 'x86_64', 'v': '1.0', 'r': '1'})
+
+        p3 = Package({'n': 'foo', 'a': 'i386'})
+        p4 = Package({'n': 'foo'})
+
+        # Version does not matter
+        self.assertEqual(hash(p1), hash(p2))
+
+        # Arch differ
+        self.assertNotEqual(hash(p1), hash(p3))
+        self.assertEqual(hash(p4), hash('foo'))
+
+        # cached hash is stable
+        self.assertEqual(hash(p1), hash(p1))
+
 
 #
 # Valid parse_str format
@@ -322,9 +383,17 @@ class PackageTestCase(TestCase):
         self.assertRegexpMatches(p5.to_pkg_spec(),
                                  r'^the_silver_searcher-0:0.31.0-1.fc\d{2}.x86_64$')
 
+        # epoch is an integer when parsed from dnf
+        p6 = Package({'n': 'foo', 'e': 1, 'v': '1.0', 'r': '1'})
+        self.assertRegexpMatches(p6.to_pkg_spec(), r'^foo-1:1.0-1.fc\d{2}$')
+
     def test_package_to_json(self):
-        # TODO
-        pass
+        p1 = Package('foo')
+        p2 = Package('~bar#1@1.2-3:x86_64')
+
+        self.assertEqual(p1.to_json(), '{"n":"foo","z":1}')
+        self.assertEqual(p2.to_json(),
+                         '{"a":"x86_64","e":"1","n":"bar","r":"3","v":"1.2","z":2}')
 
 
     def test_package_parse_dnf_invalid(self):
@@ -361,6 +430,24 @@ class PackageTestCase(TestCase):
         self.assertEqual(p_list[0], pkg1)
         self.assertEqual(pkg1, pkg2)
 
+    def test_package_resolve_many(self):
+        db = dnf.Base()
+        try:
+            db.fill_sack()
+
+        except OSError as e:
+            pass
+        p_list = db.sack.query().installed().filter(name=["python3-nose"])
+
+        p1 = Package(p_list[0])
+        p2 = Package('canvas-not-installed')
+
+        resolved = Package.resolve_many([p1, p2], db)
+
+        # Only installed packages are resolved
+        self.assertEqual({'python3-nose': p_list[0]}, resolved)
+        self.assertEqual(p1.to_pkg(db), resolved['python3-nose'])
+
     # String representation is the dnf pkg_spec format
     def test_package___str__(self):
         p1 = Package('foo:x86_64')
@@ -453,6 +540,19 @@ class PackageTestCase(TestCase):
         l1.add(p3)
         self.assertTrue(len(l1) == 2)
 
+    def test_packageset_order(self):
+        p1 = Package({'n': 'a'})
+        p2 = Package({'n': 'b'})
+        p3 = Package({'n': 'c'})
+        p4 = Package({'n': 'a', 'a': 'x86_64'})
+
+        l1 = PackageSet([p1, p2, p3])
+
+        # explicit arch replaces the undefined arch in place
+        l1.add(p4)
+        self.assertEqual(['a', 'b', 'c'], [p.name for p in l1])
+        self.assertEqual('x86_64', l1[0].arch)
+
     def test_packageset_difference(self):
         p1 = Package({'n': 'foo'})
         p2 = Package({'n': 'foo', 'a': 'x'})
@@ -471,6 +571,58 @@ class PackageTestCase(TestCase):
         self.assertEqual(PackageSet([p5]), luniq1)
         self.assertEqual(PackageSet([p6]), luniq2)
 
+    def test_packageset_union(self):
+        p1 = Package({'n': 'foo'})
+        p2 = Package({'n': 'foo', 'a': 'x'})
+        p3 = Package({'n': 'bar'})
+        p4 = Package({'n': 'baz', 'a': 'y'})
+
+        l1 = PackageSet([p1, p3])
+        l2 = PackageSet([p2])
+        l3 = PackageSet([p4])
+
+        u = l1.union(l2, l3)
+
+        # explicit arch from the other set replaces the undefined arch
+        self.assertEqual(PackageSet([p2, p3, p4]), u)
+        self.assertEqual([p2], [p for p in u if p.name == 'foo'])
+
+        # sources are left untouched
+        self.assertEqual(PackageSet([p1, p3]), l1)
+        self.assertEqual(None, [p for p in l1 if p.name == 'foo'][0].arch)
+
+    def test_packageset_discard(self):
+        p1 = Package({'n': 'foo'})
+        p2 = Package({'n': 'foo', 'a': 'x'})
+        p3 = Package({'n': 'foo', 'a': 'y'})
+        p4 = Package({'n': 'bar'})
+
+        l1 = PackageSet([p2, p3, p4])
+
+        # undefined arch removes the first package of the same name
+        l1.discard(p1)
+        self.assertEqual(PackageSet([p3, p4]), l1)
+        self.assertFalse(p2 in l1)
+        self.assertTrue(p1 in l1)
+
+        l1.discard(p3)
+        self.assertFalse(p1 in l1)
+        self.assertEqual(1, len(l1))
+
+        with self.assertRaises(ValueError):
+            l1.discard(p3)
+
+    def test_packageset_to_object(self):
+        p1 = Package({'n': 'foo', 'a': 'y'})
+        p2 = Package({'n': 'foo', 'a': 'x'})
+        p3 = Package({'n': 'bar'})
+
+        l1 = PackageSet([p1, p2, p3])
+
+        # sorted by name then arch
+        self.assertEqual([p3.to_object(), p2.to_object(), p1.to_object()],
+                         l1.to_object())
+
 
 if __name__ == "__main__":
     import unittest
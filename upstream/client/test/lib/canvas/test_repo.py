@@ -20,6 +20,9 @@ class RepoTestCase(TestCase):
         with self.assertRaises(TypeError):
             Repository(1)
 
+        with self.assertRaises(TypeError):
+            Repository(None)
+
         r1 = Repository({'name':'testrepo'})
 
         self.assertEqual('testrepo', r1.name)
@@ -55,6 +58,17 @@ class RepoTestCase(TestCase):
 
 
 
+    def test_repo_parse_str_missing_value(self):
+        # valued options require a value
+        with self.assertRaises(ValueError):
+            Repository.parse_str('repo --name=foo --baseurl')
+
+        with self.assertRaises(ValueError):
+            Repository.parse_str('repo --name --baseurl=http://fakeurl')
+
+        with self.assertRaises(ValueError):
+            Repository.parse_str('repo --name=foo --cost')
+
     def test_package_parse_str_from_name(self):
         d1 = Repository.parse_str('validreponame')
         # Name set
@@ -203,6 +217,18 @@ class RepoTestCase(TestCase):
                          'Repository: {"e":true,"i":false,"n":"Korora 23 - i386 - Updates","s":"korora-23-i386-updates","z":1}')
 
 
+    def test_repo_to_object(self):
+        r1 = Repository({'n': 'test', 's': 'foo', 'bu': ['http://fakeurl'], 'c': 0})
+
+        # unset values are omitted, falsy values are kept
+        self.assertEqual(r1.to_object(),
+                         {'n': 'test',
+                          's': 'foo',
+                          'bu': ['http://fakeurl'],
+                          'c': 0,
+                          'i': False,
+                          'z': Repository.ACTION_INCLUDE})
+
     def test_repo_equality(self):
         r1 = Repository({'n':'test', 's': 'foo'})
         r2 = Repository({'n':'test', 's': 'foo', 'bu': 'foo'})
@@ -285,6 +311,25 @@ class RepoTestCase(TestCase):
         l1.add(r3)
         self.assertTrue(len(l1) == 2)
 
+    def test_reposet_discard(self):
+        r1 = Repository({'n':'test', 's': 'foo', 'bu': 'x'})
+        r2 = Repository({'n':'test', 's': 'foo', 'bu': 'y'})
+        r3 = Repository({'n':'test', 's': 'bar', 'bu': 'x'})
+
+        l1 = RepoSet([r1, r3])
+
+        # stub is the equality check
+        l1.discard(r2)
+        self.assertFalse(r1 in l1)
+        self.assertEqual(RepoSet([r3]), l1)
+
+        with self.assertRaises(ValueError):
+            l1.discard(r1)
+
+        l1.add(r2)
+        self.assertTrue(r1 in l1)
+        self.assertEqual(l1[1].baseurl, 'y')
+
     def test_reposet_difference(self):
         r1 = Repository({'n':'test', 's': 'foo', 'bu': 'x'})
         r2 = Repository({'n':'test', 's': 'bar', 'bu': 'y'})